@@ -10,33 +10,32 @@ For production, use: gunicorn app:app
 
 from __future__ import annotations
 
-import json
-from functools import lru_cache
+import os
+import sys
 from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+from typing import Optional, Tuple, Union
 
-from fastapi import FastAPI, HTTPException
+import orjson
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-
-# Paths configuration
-BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR / "data"
-OBJECTIVES_PATH = DATA_DIR / "objectives.json"
-INTERFERENCE_RESULTS_PATH = DATA_DIR / "interference_results.jsonl"
-PHYSIOLOGY_RESULTS_PATH = DATA_DIR / "physiological_results.jsonl"
-
-# Axis configuration
-AXIS_LABELS: Mapping[str, str] = {
-    "body_composition": "Body composition",
-    "strength_local_endurance": "Strength & local endurance",
-    "power_speed": "Power & speed",
-    "endurance": "Endurance",
-    "motor_control_skill": "Motor control & skill",
-}
-AXIS_ORDER: Tuple[str, ...] = tuple(AXIS_LABELS.keys())
+from starlette.types import Scope
+
+from indices import (
+    BASE_DIR,
+    ResponseBodies,
+    accepts_gzip,
+    interference_responses,
+    normalise_objective_ids,
+    radar_responses,
+)
+
+VENDOR_DIR = BASE_DIR / "vendor"
+
+# Precomputed API bodies vary by Accept-Encoding, so caches must key on it.
+JSON_HEADERS = {"Vary": "Accept-Encoding"}
+GZIP_JSON_HEADERS = {"Vary": "Accept-Encoding", "Content-Encoding": "gzip"}
 
 # Create FastAPI app
 app = FastAPI(
@@ -53,211 +52,135 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static directories
-app.mount("/vendor", StaticFiles(directory="vendor"), name="vendor")
-app.mount("/data", StaticFiles(directory="data"), name="data")
-
-
-# Request/Response models
-class ObjectivesRequest(BaseModel):
-    objectives: List[str]
-
-
-# Data loading functions (reused from server.py)
-def _load_json(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
-
-
-def _load_json_lines(path: Path) -> Iterable[dict]:
-    with path.open("r", encoding="utf-8") as fp:
-        for line in fp:
-            line = line.strip()
-            if not line:
-                continue
-            yield json.loads(line)
-
-
-def _load_objective_ids() -> Iterable[str]:
-    payload = _load_json(OBJECTIVES_PATH)
-    for category in payload.get("categories", []):
-        for objective in category.get("objectives", []):
-            objective_id = objective.get("id")
-            if objective_id:
-                yield str(objective_id)
-
-
-@lru_cache(maxsize=1)
-def _objective_id_set() -> frozenset[str]:
-    return frozenset(_load_objective_ids())
-
-
-def _normalise_objective_ids(objective_ids: Iterable[str]) -> Tuple[str, ...]:
-    normalised = tuple(sorted({str(obj_id) for obj_id in objective_ids if str(obj_id)}))
-    if not normalised:
-        return tuple()
-    missing = [obj_id for obj_id in normalised if obj_id not in _objective_id_set()]
-    if missing:
-        raise ValueError(f"Unknown objective IDs: {', '.join(missing)}")
-    return normalised
-
-
-@lru_cache(maxsize=1)
-def _interference_index() -> Dict[Tuple[str, ...], dict]:
-    index: Dict[Tuple[str, ...], dict] = {}
-    for record in _load_json_lines(INTERFERENCE_RESULTS_PATH):
-        identifiers = record.get("inputs") or record.get("objectives") or []
-        key = tuple(sorted(str(obj_id) for obj_id in identifiers if obj_id))
-        if key:
-            index[key] = record
-    return index
-
-
-@lru_cache(maxsize=1)
-def _physiology_index() -> Dict[Tuple[str, ...], dict]:
-    index: Dict[Tuple[str, ...], dict] = {}
-    for record in _load_json_lines(PHYSIOLOGY_RESULTS_PATH):
-        identifiers = record.get("objectives") or record.get("inputs") or []
-        key = tuple(sorted(str(obj_id) for obj_id in identifiers if obj_id))
-        if key:
-            index[key] = record
-    return index
-
-
-def _format_interference(ids: Sequence[str]) -> Mapping[str, object]:
-    if not ids:
-        return {
-            "objectives": [],
-            "score": 0.0,
-            "score_base": 0.0,
-            "breakdown": [],
-            "redundancy_flags": [],
-        }
-
-    key = tuple(ids)
-    record = _interference_index().get(key)
-    if record is None:
-        raise ValueError(f"No interference data for: {', '.join(ids)}")
-
-    breakdown = [
-        {
-            "axis": item.get("axis"),
-            "label": item.get("label"),
-            "contribution": item.get("contribution"),
-            "interference": item.get("interference"),
-        }
-        for item in record.get("breakdown", [])
-        if isinstance(item, dict)
-    ]
-
-    flags: List[str] = []
-    triple = record.get("triple")
-    if isinstance(triple, dict):
-        raw_flags = triple.get("flags")
-        if isinstance(raw_flags, list):
-            flags = [flag for flag in raw_flags if isinstance(flag, str)]
-
-    return {
-        "objectives": list(key),
-        "score": record.get("score", 0.0),
-        "score_base": record.get("score_base", 0.0),
-        "breakdown": breakdown,
-        "redundancy_flags": flags,
-    }
-
-
-def _format_radar(ids: Sequence[str]) -> Mapping[str, object]:
-    if not ids:
-        return {
-            "objectives": [],
-            "labels": [AXIS_LABELS[axis] for axis in AXIS_ORDER],
-            "values": [0.0 for _ in AXIS_ORDER],
-            "axes": {axis: 0.0 for axis in AXIS_ORDER},
-            "meta": {},
-        }
-
-    key = tuple(ids)
-    record = _physiology_index().get(key)
-    if record is None:
-        raise ValueError(f"No physiological profile for: {', '.join(ids)}")
-
-    axes_payload = record.get("axes", {})
-    axes = {axis: float(axes_payload.get(axis, 0.0)) for axis in AXIS_ORDER}
-    labels = [AXIS_LABELS[axis] for axis in AXIS_ORDER]
-    values = [axes[axis] for axis in AXIS_ORDER]
-
-    meta = record.get("meta", {})
-    if not isinstance(meta, dict):
-        meta = {}
-
-    return {
-        "objectives": list(key),
-        "labels": labels,
-        "values": values,
-        "axes": axes,
-        "meta": meta,
-    }
 
+class PlannerStaticFiles(StaticFiles):
+    """Frontend files only, with long-lived caching for the pinned ``vendor/`` bundles.
 
-# API Endpoints
-@app.post("/api/interference")
-async def interference(request: ObjectivesRequest) -> dict:
-    """Return interference score and breakdown for the selected objectives."""
-    try:
-        objective_ids = _normalise_objective_ids(request.objectives)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
+    The mount's directory is the app root, so lookups are limited to an
+    allow-list; the server's own source and config are never served.
+    """
 
-    try:
-        return _format_interference(objective_ids)
-    except ValueError as exc:
-        raise HTTPException(status_code=404, detail=str(exc))
+    VENDOR_CACHE_CONTROL = "public, max-age=31536000, immutable"
+    ALLOWED_FILES = frozenset({".", "index.html", "styles.css", "app.js", "app.legacy.js"})
+    ALLOWED_DIRS = frozenset({"vendor", "data"})
 
+    def lookup_path(self, path: str) -> Tuple[str, Optional[os.stat_result]]:
+        normalised = os.path.normpath(path)
+        top = normalised.split(os.sep, 1)[0]
+        if normalised not in self.ALLOWED_FILES and (top not in self.ALLOWED_DIRS or top == normalised):
+            return "", None
+        return super().lookup_path(path)
 
-@app.post("/api/radar")
-async def radar(request: ObjectivesRequest) -> dict:
-    """Return aggregated physiological profile for the selected objectives."""
-    try:
-        objective_ids = _normalise_objective_ids(request.objectives)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
+    def file_response(
+        self,
+        full_path: Union[str, os.PathLike[str]],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if Path(full_path).is_relative_to(VENDOR_DIR):
+            response.headers["Cache-Control"] = self.VENDOR_CACHE_CONTROL
+        return response
 
+
+def _parse_objective_ids(body: bytes) -> frozenset[str]:
+    """Decode a ``{"objectives": [...]}`` request body into normalised IDs."""
     try:
-        return _format_radar(objective_ids)
-    except ValueError as exc:
-        raise HTTPException(status_code=404, detail=str(exc))
+        payload = orjson.loads(body or b"{}")
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+
+    objectives = payload.get("objectives", []) if isinstance(payload, dict) else None
+    if not isinstance(objectives, list) or not all(isinstance(obj_id, str) for obj_id in objectives):
+        raise HTTPException(status_code=400, detail="Expected an 'objectives' list of strings")
+
+    ids, unknown = normalise_objective_ids(objectives)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Unknown objectives", "unknown_objectives": unknown},
+        )
+    return ids
 
 
-# Serve static files
-@app.get("/")
-async def read_root():
-    """Serve the main HTML file."""
-    return FileResponse("index.html")
+def _json_body_response(request: Request, bodies: ResponseBodies) -> Response:
+    """Return the precompressed body when the client accepts gzip."""
+    body, body_gzip = bodies
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        return Response(body_gzip, media_type="application/json", headers=GZIP_JSON_HEADERS)
+    return Response(body, media_type="application/json", headers=JSON_HEADERS)
 
 
-@app.get("/styles.css")
-async def read_styles():
-    """Serve the CSS file."""
-    return FileResponse("styles.css")
+# Build the response tables at import, next to the indices they serialise,
+# so no request pays for them.
+interference_responses()
+radar_responses()
 
 
-@app.get("/app.js")
-async def read_app_js():
-    """Serve the main JavaScript file."""
-    return FileResponse("app.js")
+# API Endpoints
+@app.post("/api/interference")
+async def interference(request: Request) -> Response:
+    """Return interference score and breakdown for the selected objectives."""
+    objective_ids = _parse_objective_ids(await request.body())
+
+    bodies = interference_responses().get(objective_ids)
+    if bodies is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "interference_not_found",
+                "message": "No interference data available for the requested combination.",
+                "objectives": sorted(objective_ids),
+            },
+        )
+    return _json_body_response(request, bodies)
 
 
-@app.get("/app.legacy.js")
-async def read_app_legacy_js():
-    """Serve the legacy JavaScript file."""
-    return FileResponse("app.legacy.js")
+@app.post("/api/radar")
+async def radar(request: Request) -> Response:
+    """Return aggregated physiological profile for the selected objectives."""
+    objective_ids = _parse_objective_ids(await request.body())
+
+    bodies = radar_responses().get(objective_ids)
+    if bodies is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "physiology_not_found",
+                "message": "No physiological profile available for the requested combination.",
+                "objectives": sorted(objective_ids),
+            },
+        )
+    return _json_body_response(request, bodies)
 
 
 # Health check endpoint for Render
-@app.get("/health")
-async def health_check():
+@app.get("/health", response_class=ORJSONResponse)
+async def health_check() -> ORJSONResponse:
     """Health check endpoint for monitoring."""
-    return {"status": "ok", "service": "Hybrid Objective Planner"}
+    return ORJSONResponse({"status": "ok", "service": "Hybrid Objective Planner"})
+
+
+# Unknown /api paths must not fall through to the static mount: they answer
+# 404, and the known endpoints answer 405 for methods other than POST.
+API_ENDPOINTS = frozenset({"interference", "radar"})
+
+
+@app.api_route(
+    "/api/{endpoint:path}",
+    methods=["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"],
+    include_in_schema=False,
+)
+async def api_fallback(endpoint: str) -> None:
+    if endpoint in API_ENDPOINTS:
+        raise HTTPException(status_code=405, headers={"Allow": "POST"})
+    raise HTTPException(status_code=404, detail="Unknown API endpoint")
+
+
+# Serve the frontend (index.html at "/", assets, vendor/ and data/) from one
+# mount. It is registered last so the API and health routes take precedence.
+app.mount("/", PlannerStaticFiles(directory=str(BASE_DIR), html=True), name="static")
 
 
 if __name__ == "__main__":
@@ -265,5 +188,13 @@ if __name__ == "__main__":
 
     print("Hybrid objective planner running at http://127.0.0.1:8000")
     print("Press Ctrl+C to stop.")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # A single process: indices loads the datasets at import time, so extra
+    # workers would each hold another copy. uvloop has no Windows build.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+    )
 
@@ -0,0 +1,301 @@
+"""Shared data indices for the Hybrid Objective Planner services.
+
+``app.py``, ``server.py``, ``interference_api.py`` and ``physiology_api.py`` all
+serve the datasets in ``data/``. They are parsed once, when this module is
+imported, into module-level singletons keyed by the frozenset of objective IDs,
+so a process importing several services holds a single copy of each dataset.
+
+orjson is used when it is installed; otherwise the standard library ``json``
+module is used so that ``server.py`` keeps working without dependencies.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar
+
+try:  # orjson is optional; the server must keep working with the stdlib only.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the local environment
+    orjson = None
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+OBJECTIVES_PATH = DATA_DIR / "objectives.json"
+INTERFERENCE_RESULTS_PATH = DATA_DIR / "interference_results.jsonl"
+PHYSIOLOGY_RESULTS_PATH = DATA_DIR / "physiological_results.jsonl"
+
+AXIS_LABELS: Mapping[str, str] = {
+    "body_composition": "Body composition",
+    "strength_local_endurance": "Strength & local endurance",
+    "power_speed": "Power & speed",
+    "endurance": "Endurance",
+    "motor_control_skill": "Motor control & skill",
+}
+AXIS_ORDER: Tuple[str, ...] = tuple(AXIS_LABELS.keys())
+AXIS_LABEL_LIST: Tuple[str, ...] = tuple(AXIS_LABELS[axis] for axis in AXIS_ORDER)
+
+# Radar profile stored per combination: (values in AXIS_ORDER, axes mapping, meta).
+RadarProfile = Tuple[Tuple[float, ...], Dict[str, float], Dict[str, object]]
+
+_Entry = TypeVar("_Entry")
+
+if orjson is not None:
+    JSON_DECODE_ERRORS: Tuple[Type[BaseException], ...] = (orjson.JSONDecodeError,)
+
+    def loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+
+else:
+    JSON_DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError)
+
+    def loads(data: bytes) -> Any:
+        return json.loads(data.decode("utf-8"))
+
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data).encode("utf-8")
+
+
+def load_json(path: Path) -> dict:
+    with path.open("rb") as fp:
+        return loads(fp.read())
+
+
+def load_json_lines(path: Path) -> Iterable[dict]:
+    # One read for the whole file; blank lines are skipped without stripping.
+    parse = loads
+    for line in path.read_bytes().splitlines():
+        if not line or line.isspace():
+            continue
+        yield parse(line)
+
+
+def _intern(value: Any) -> Any:
+    # Axis names, labels, flags and objective IDs repeat across thousands of
+    # records; interning keeps one shared string object per distinct value.
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _load_objective_ids() -> Iterable[str]:
+    payload = load_json(OBJECTIVES_PATH)
+    for category in payload.get("categories", []):
+        for objective in category.get("objectives", []):
+            objective_id = objective.get("id")
+            if objective_id:
+                yield sys.intern(str(objective_id))
+
+
+def _shape_interference(key: frozenset[str], record: dict) -> Dict[str, object]:
+    raw_breakdown = record.get("breakdown") or []
+    if not isinstance(raw_breakdown, list):
+        raw_breakdown = []
+    breakdown = [
+        {
+            "axis": _intern(item.get("axis")),
+            "label": _intern(item.get("label")),
+            "contribution": item.get("contribution"),
+            "interference": item.get("interference"),
+        }
+        for item in raw_breakdown
+        if isinstance(item, dict)
+    ]
+
+    flags: List[str] = []
+    triple = record.get("triple")
+    if isinstance(triple, dict):
+        raw_flags = triple.get("flags")
+        if isinstance(raw_flags, list):
+            flags = [sys.intern(flag) for flag in raw_flags if isinstance(flag, str)]
+
+    return {
+        "objectives": sorted(key),
+        "score": record.get("score", 0.0),
+        "score_base": record.get("score_base", 0.0),
+        "breakdown": breakdown,
+        "redundancy_flags": flags,
+    }
+
+
+def _axis_value(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _shape_radar(key: frozenset[str], record: dict) -> RadarProfile:
+    axes_payload = record.get("axes")
+    if not isinstance(axes_payload, dict):
+        axes_payload = {}
+    values = tuple(_axis_value(axes_payload.get(axis, 0.0)) for axis in AXIS_ORDER)
+    meta = record.get("meta", {})
+    if not isinstance(meta, dict):
+        meta = {}
+    return (values, dict(zip(AXIS_ORDER, values)), meta)
+
+
+def _build_index(
+    path: Path,
+    key_fields: Sequence[str],
+    shape: Callable[[frozenset[str], dict], _Entry],
+) -> Dict[frozenset[str], _Entry]:
+    """Index the records of a results file by the frozenset of their objective IDs.
+
+    Each file names its IDs with a single field: the first of ``key_fields``
+    found in a record becomes canonical and is read from every later line.
+    Records without a list in that field are skipped, as before, and the
+    ``shape`` callbacks default bad values instead of raising, so one
+    malformed line cannot stop the services from importing this module.
+    IDs are interned as-is when they are all strings; only a list holding
+    other values is coerced with ``str()``.
+    """
+    index: Dict[frozenset[str], _Entry] = {}
+    store = index.__setitem__
+    intern = sys.intern
+    key_field: Optional[str] = None
+    for record in load_json_lines(path):
+        if not isinstance(record, dict):
+            continue
+        if key_field is None:
+            key_field = next((field for field in key_fields if field in record), None)
+            if key_field is None:
+                continue
+        identifiers = record.get(key_field)
+        if not identifiers or not isinstance(identifiers, list):
+            continue
+        try:
+            key = frozenset(map(intern, identifiers))
+        except TypeError:
+            key = frozenset([intern(str(obj_id)) for obj_id in identifiers if obj_id])
+        else:
+            if "" in key:
+                key = key - {""}
+        if key:
+            store(key, shape(key, record))
+    return index
+
+
+def _load_interference_index() -> Dict[frozenset[str], Dict[str, object]]:
+    # Records are validated and reduced to the response schema here, so the
+    # unused fields (components, config_version, ...) are not kept in memory.
+    return _build_index(INTERFERENCE_RESULTS_PATH, ("inputs", "objectives"), _shape_interference)
+
+
+def _load_physiology_index() -> Dict[frozenset[str], RadarProfile]:
+    return _build_index(PHYSIOLOGY_RESULTS_PATH, ("objectives", "inputs"), _shape_radar)
+
+
+OBJECTIVE_IDS: frozenset[str] = frozenset(_load_objective_ids())
+INTERFERENCE: Dict[frozenset[str], Dict[str, object]] = _load_interference_index()
+PHYSIOLOGY: Dict[frozenset[str], RadarProfile] = _load_physiology_index()
+
+
+def normalise_objective_ids(objective_ids: Iterable[Any]) -> Tuple[frozenset[str], List[str]]:
+    """Return the requested IDs as an index key plus the sorted unknown ones.
+
+    Callers turn a non-empty unknown list into their own error response.
+    """
+    ids = frozenset(str(obj_id) for obj_id in objective_ids if obj_id)
+    return ids, sorted(ids - OBJECTIVE_IDS)
+
+
+def format_interference(ids: frozenset[str]) -> Mapping[str, object]:
+    """Return the ``/api/interference`` payload; raise ``KeyError`` if not indexed."""
+    if not ids:
+        return {
+            "objectives": [],
+            "score": 0.0,
+            "score_base": 0.0,
+            "breakdown": [],
+            "redundancy_flags": [],
+        }
+
+    payload = INTERFERENCE.get(ids)
+    if payload is None:
+        raise KeyError(f"No interference data for: {', '.join(sorted(ids))}")
+    return payload
+
+
+def format_radar(ids: frozenset[str]) -> Mapping[str, object]:
+    """Build the ``/api/radar`` payload; raise ``KeyError`` if not indexed."""
+    if not ids:
+        return {
+            "objectives": [],
+            "labels": AXIS_LABEL_LIST,
+            "values": [0.0 for _ in AXIS_ORDER],
+            "axes": {axis: 0.0 for axis in AXIS_ORDER},
+            "meta": {},
+        }
+
+    profile = PHYSIOLOGY.get(ids)
+    if profile is None:
+        raise KeyError(f"No physiological profile for: {', '.join(sorted(ids))}")
+
+    values, axes, meta = profile
+    return {
+        "objectives": sorted(ids),
+        "labels": AXIS_LABEL_LIST,
+        "values": values,
+        "axes": axes,
+        "meta": meta,
+    }
+
+
+# Serialised response tables, built on first use (or by the servers' warm-up).
+# Each entry holds the plain JSON body and its gzip-compressed copy.
+ResponseBodies = Tuple[bytes, bytes]
+_INTERFERENCE_RESPONSES: Optional[Dict[frozenset[str], ResponseBodies]] = None
+_RADAR_RESPONSES: Optional[Dict[frozenset[str], ResponseBodies]] = None
+
+
+def _encode(payload: Mapping[str, object]) -> ResponseBodies:
+    body = dumps(payload)
+    # mtime=0 keeps the compressed bytes identical across restarts and workers.
+    return body, gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def _serialise_responses(
+    index: Mapping[frozenset[str], Any],
+    format_payload: Callable[[frozenset[str]], Mapping[str, object]],
+) -> Dict[frozenset[str], ResponseBodies]:
+    responses = {key: _encode(format_payload(key)) for key in index}
+    responses[frozenset()] = _encode(format_payload(frozenset()))
+    return responses
+
+
+def interference_responses() -> Dict[frozenset[str], ResponseBodies]:
+    """Serialised ``/api/interference`` bodies for every indexed combination."""
+    global _INTERFERENCE_RESPONSES
+    if _INTERFERENCE_RESPONSES is None:
+        _INTERFERENCE_RESPONSES = _serialise_responses(INTERFERENCE, format_interference)
+    return _INTERFERENCE_RESPONSES
+
+
+def radar_responses() -> Dict[frozenset[str], ResponseBodies]:
+    """Serialised ``/api/radar`` bodies for every indexed combination."""
+    global _RADAR_RESPONSES
+    if _RADAR_RESPONSES is None:
+        _RADAR_RESPONSES = _serialise_responses(PHYSIOLOGY, format_radar)
+    return _RADAR_RESPONSES
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Return whether an ``Accept-Encoding`` header value allows gzip."""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() != "gzip":
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
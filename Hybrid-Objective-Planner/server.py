@@ -14,166 +14,32 @@ Static assets in this directory are also served so that running
 
 from __future__ import annotations
 
-import json
-from functools import lru_cache
 from http import HTTPStatus
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Mapping, Tuple
 
+import os
 import sys
 
-BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR / "data"
-OBJECTIVES_PATH = DATA_DIR / "objectives.json"
-INTERFERENCE_RESULTS_PATH = DATA_DIR / "interference_results.jsonl"
-PHYSIOLOGY_RESULTS_PATH = DATA_DIR / "physiological_results.jsonl"
+from indices import (
+    BASE_DIR,
+    JSON_DECODE_ERRORS,
+    accepts_gzip,
+    dumps,
+    interference_responses,
+    loads,
+    normalise_objective_ids,
+    radar_responses,
+)
 
 API_PREFIX = "/api"
+ACCESS_LOG = os.environ.get("PLANNER_ACCESS_LOG", "") == "1"
 
-AXIS_LABELS: Mapping[str, str] = {
-    "body_composition": "Body composition",
-    "strength_local_endurance": "Strength & local endurance",
-    "power_speed": "Power & speed",
-    "endurance": "Endurance",
-    "motor_control_skill": "Motor control & skill",
-}
-AXIS_ORDER: Tuple[str, ...] = tuple(AXIS_LABELS.keys())
-
-
-def _load_json(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
-
-
-def _load_json_lines(path: Path) -> Iterable[dict]:
-    with path.open("r", encoding="utf-8") as fp:
-        for line in fp:
-            line = line.strip()
-            if not line:
-                continue
-            yield json.loads(line)
-
-
-def _load_objective_ids() -> Iterable[str]:
-    payload = _load_json(OBJECTIVES_PATH)
-    for category in payload.get("categories", []):
-        for objective in category.get("objectives", []):
-            objective_id = objective.get("id")
-            if objective_id:
-                yield str(objective_id)
-
-
-@lru_cache(maxsize=1)
-def _objective_id_set() -> frozenset[str]:
-    return frozenset(_load_objective_ids())
-
-
-def _normalise_objective_ids(objective_ids: Iterable[str]) -> Tuple[str, ...]:
-    normalised = tuple(sorted({str(obj_id) for obj_id in objective_ids if str(obj_id)}))
-    if not normalised:
-        return tuple()
-    missing = [obj_id for obj_id in normalised if obj_id not in _objective_id_set()]
-    if missing:
-        raise KeyError(f"Unknown objective IDs: {', '.join(missing)}")
-    return normalised
-
-
-@lru_cache(maxsize=1)
-def _interference_index() -> Dict[Tuple[str, ...], dict]:
-    index: Dict[Tuple[str, ...], dict] = {}
-    for record in _load_json_lines(INTERFERENCE_RESULTS_PATH):
-        identifiers = record.get("inputs") or record.get("objectives") or []
-        key = tuple(sorted(str(obj_id) for obj_id in identifiers if obj_id))
-        if key:
-            index[key] = record
-    return index
-
-
-@lru_cache(maxsize=1)
-def _physiology_index() -> Dict[Tuple[str, ...], dict]:
-    index: Dict[Tuple[str, ...], dict] = {}
-    for record in _load_json_lines(PHYSIOLOGY_RESULTS_PATH):
-        identifiers = record.get("objectives") or record.get("inputs") or []
-        key = tuple(sorted(str(obj_id) for obj_id in identifiers if obj_id))
-        if key:
-            index[key] = record
-    return index
-
-
-def _format_interference(ids: Sequence[str]) -> Mapping[str, object]:
-    if not ids:
-        return {
-            "objectives": [],
-            "score": 0.0,
-            "score_base": 0.0,
-            "breakdown": [],
-            "redundancy_flags": [],
-        }
-
-    key = tuple(ids)
-    record = _interference_index().get(key)
-    if record is None:
-        raise KeyError(f"No interference data for: {', '.join(ids)}")
-
-    breakdown = [
-        {
-            "axis": item.get("axis"),
-            "label": item.get("label"),
-            "contribution": item.get("contribution"),
-            "interference": item.get("interference"),
-        }
-        for item in record.get("breakdown", [])
-        if isinstance(item, dict)
-    ]
-
-    flags: List[str] = []
-    triple = record.get("triple")
-    if isinstance(triple, dict):
-        raw_flags = triple.get("flags")
-        if isinstance(raw_flags, list):
-            flags = [flag for flag in raw_flags if isinstance(flag, str)]
-
-    return {
-        "objectives": list(key),
-        "score": record.get("score", 0.0),
-        "score_base": record.get("score_base", 0.0),
-        "breakdown": breakdown,
-        "redundancy_flags": flags,
-    }
-
-
-def _format_radar(ids: Sequence[str]) -> Mapping[str, object]:
-    if not ids:
-        return {
-            "objectives": [],
-            "labels": [AXIS_LABELS[axis] for axis in AXIS_ORDER],
-            "values": [0.0 for _ in AXIS_ORDER],
-            "axes": {axis: 0.0 for axis in AXIS_ORDER},
-            "meta": {},
-        }
-
-    key = tuple(ids)
-    record = _physiology_index().get(key)
-    if record is None:
-        raise KeyError(f"No physiological profile for: {', '.join(ids)}")
-
-    axes_payload = record.get("axes", {})
-    axes = {axis: float(axes_payload.get(axis, 0.0)) for axis in AXIS_ORDER}
-    labels = [AXIS_LABELS[axis] for axis in AXIS_ORDER]
-    values = [axes[axis] for axis in AXIS_ORDER]
-
-    meta = record.get("meta", {})
-    if not isinstance(meta, dict):
-        meta = {}
-
-    return {
-        "objectives": list(key),
-        "labels": labels,
-        "values": values,
-        "axes": axes,
-        "meta": meta,
-    }
+CORS_HEADERS: Tuple[Tuple[str, str], ...] = (
+    ("Access-Control-Allow-Origin", "*"),
+    ("Access-Control-Allow-Methods", "POST, OPTIONS"),
+    ("Access-Control-Allow-Headers", "Content-Type"),
+)
 
 
 class PlannerRequestHandler(SimpleHTTPRequestHandler):
@@ -196,51 +62,98 @@ class PlannerRequestHandler(SimpleHTTPRequestHandler):
         content_length = int(self.headers.get("Content-Length", "0"))
         raw_body = self.rfile.read(content_length) if content_length else b"{}"
         try:
-            payload = json.loads(raw_body.decode("utf-8"))
-        except json.JSONDecodeError:
+            payload = loads(raw_body)
+        except JSON_DECODE_ERRORS:
             self._json_response({"error": "Invalid JSON payload"}, status=HTTPStatus.BAD_REQUEST)
             return
 
-        objective_ids = payload.get("objectives", []) if isinstance(payload, dict) else []
-        try:
-            objective_ids = _normalise_objective_ids(objective_ids)
-        except KeyError as exc:
-            self._json_response({"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+        objectives = payload.get("objectives", []) if isinstance(payload, dict) else []
+        objective_ids, unknown = normalise_objective_ids(objectives)
+        if unknown:
+            error = f"Unknown objective IDs: {', '.join(unknown)}"
+            self._json_response({"error": error}, status=HTTPStatus.BAD_REQUEST)
             return
 
         if self.path == f"{API_PREFIX}/interference":
-            try:
-                self._json_response(_format_interference(objective_ids))
-            except KeyError as exc:
-                self._json_response({"error": str(exc)}, status=HTTPStatus.NOT_FOUND)
+            bodies = interference_responses().get(objective_ids)
+            not_found = "No interference data for"
         elif self.path == f"{API_PREFIX}/radar":
-            try:
-                self._json_response(_format_radar(objective_ids))
-            except KeyError as exc:
-                self._json_response({"error": str(exc)}, status=HTTPStatus.NOT_FOUND)
+            bodies = radar_responses().get(objective_ids)
+            not_found = "No physiological profile for"
         else:
             self._json_response({"error": "Unknown API endpoint"}, status=HTTPStatus.NOT_FOUND)
+            return
+
+        if bodies is None:
+            error = f"{not_found}: {', '.join(sorted(objective_ids))}"
+            self._json_response({"error": error}, status=HTTPStatus.NOT_FOUND)
+            return
+
+        body, body_gzip = bodies
+        if accepts_gzip(self.headers.get("Accept-Encoding", "")):
+            self._send_json_body(body_gzip, gzipped=True)
+        else:
+            self._send_json_body(body)
 
     def _send_cors_headers(self) -> None:
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        for keyword, value in CORS_HEADERS:
+            self.send_header(keyword, value)
 
     def _json_response(self, data: Mapping[str, object], status: HTTPStatus = HTTPStatus.OK) -> None:
-        body = json.dumps(data).encode("utf-8")
-        self.send_response(status)
-        self._send_cors_headers()
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
+        self._send_json_body(dumps(data), status)
+
+    def _send_json_body(
+        self, body: bytes, status: HTTPStatus = HTTPStatus.OK, gzipped: bool = False
+    ) -> None:
+        if status is not HTTPStatus.OK:
+            self.send_response(status)
+            self._send_cors_headers()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.log_request(status.value, len(body))
+        # Status line, headers and body go out in a single write.
+        tail = (
+            f"Date: {self.date_time_string()}\r\n"
+            + ("Content-Encoding: gzip\r\n" if gzipped else "")
+            + f"Content-Length: {len(body)}\r\n\r\n"
+        )
+        self.wfile.write(b"".join((JSON_OK_HEAD, tail.encode("latin-1"), body)))
+
+    def log_request(self, code: int | str = "-", size: int | str = "-") -> None:
+        # Access lines contend on stdout, so they are opt-in via PLANNER_ACCESS_LOG=1.
+        # Errors always go through log_message via log_error.
+        if ACCESS_LOG:
+            super().log_request(code, size)
 
     def log_message(self, format: str, *args) -> None:  # noqa: A003 - inherited signature
         sys.stdout.write("[server] " + (format % args) + "\n")
 
 
+# Every successful API response starts with the same status line and headers,
+# so that block is encoded once; only Date, Content-Length and Content-Encoding
+# vary per request.
+JSON_OK_HEAD = (
+    f"{PlannerRequestHandler.protocol_version} 200 OK\r\n"
+    f"Server: {PlannerRequestHandler.server_version} {PlannerRequestHandler.sys_version}\r\n"
+    + "".join(f"{keyword}: {value}\r\n" for keyword, value in CORS_HEADERS)
+    + "Content-Type: application/json\r\n"
+    + "Vary: Accept-Encoding\r\n"
+).encode("latin-1")
+
+
+def _warm_caches() -> None:
+    interference_responses()
+    radar_responses()
+
+
 def run(host: str = "0.0.0.0", port: int = 8000) -> None:
-    server = HTTPServer((host, port), PlannerRequestHandler)
+    _warm_caches()
+    server = ThreadingHTTPServer((host, port), PlannerRequestHandler)
+    server.daemon_threads = True
     print(f"Hybrid objective planner running at http://{host}:{port}")
     print("Press Ctrl+C to stop.")
     try: